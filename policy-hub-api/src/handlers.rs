@@ -8,7 +8,7 @@ use axum::{
 };
 use std::sync::Arc;
 use policy_hub_core::{
-    CreatePolicyRequest, CreateRuleTemplateRequest, ExecutePolicyRequest, Policy, RuleTemplate,
+    BulkSetupRequest, BulkSetupResponse, CreatePolicyRequest, CreateRuleTemplateRequest, ExecutePolicyRequest, Policy, RuleTemplate,
     RuleTemplateVersionInfo, RuleTemplateVersionsResponse,
 };
 use policy_hub_storage::{PolicyStorage, RuleTemplateStorage};
@@ -19,12 +19,12 @@ use uuid::Uuid;
 use crate::{ApiError, AppState};
 
 /// Helper to rebuild the WASM bundle and save to file system
-/// Accepts an optional new_policy to ensure it's included (bypasses N1QL eventual consistency)
-async fn rebuild_bundle(state: &AppState, new_policy: Option<Policy>) -> Result<(), ApiError> {
+/// Accepts newly created policies to ensure they're included (bypasses N1QL eventual consistency)
+async fn rebuild_bundle(state: &AppState, new_policies: &[Policy]) -> Result<(), ApiError> {
     let mut policies = PolicyStorage::list(state.policy_storage.as_ref()).await?;
     
-    // If a new policy is provided, ensure it's in the list (handles Couchbase eventual consistency)
-    if let Some(ref policy) = new_policy {
+    // Ensure new policies are in the list (handles Couchbase eventual consistency)
+    for policy in new_policies {
         if !policies.iter().any(|p| p.id == policy.id) {
             tracing::debug!("Adding new policy {} to bundle (not yet visible in N1QL)", policy.id);
             policies.push(policy.clone());
@@ -99,7 +99,7 @@ pub async fn create_rule_template(
     let saved = RuleTemplateStorage::save(state.rule_storage.as_ref(), template).await?;
 
     // Trigger bundle rebuild (compilation happens here, saved to file system)
-    if let Err(e) = rebuild_bundle(&state, None).await {
+    if let Err(e) = rebuild_bundle(&state, &[]).await {
         tracing::error!("Failed to rebuild bundle: {}", e);
         // We continue, as the rule is saved, but execution might use old bundle until next update.
     }
@@ -211,7 +211,7 @@ pub async fn create_policy(
     let saved = PolicyStorage::save(state.policy_storage.as_ref(), policy).await?;
 
     // Trigger bundle rebuild
-    if let Err(e) = rebuild_bundle(&state, Some(saved.clone())).await {
+    if let Err(e) = rebuild_bundle(&state, std::slice::from_ref(&saved)).await {
         tracing::error!("Failed to rebuild bundle: {}", e);
     }
 
@@ -242,6 +242,79 @@ pub async fn list_policies(
     Ok(Json(policies))
 }
 
+// ==================== Bulk Setup Handler ====================
+
+/// Create several rule templates and policies, rebuilding the bundle once
+pub async fn bulk_setup(
+    State(state): State<Arc<AppState>>,
+    Json(req): Json<BulkSetupRequest>,
+) -> Result<impl IntoResponse, ApiError> {
+    // Validate every source up front so a bad request doesn't leave a partial setup
+    for t in &req.templates {
+        state.compiler.validate(&t.source)?;
+    }
+
+    // Build every template version in memory; later entries with the same name
+    // become new versions of earlier ones
+    let mut pending = Vec::with_capacity(req.templates.len());
+    let mut by_name: HashMap<String, RuleTemplate> = HashMap::new();
+    for t in req.templates {
+        let existing = match by_name.get(&t.name) {
+            Some(latest) => Some(latest.clone()),
+            None => RuleTemplateStorage::get_latest_by_name(state.rule_storage.as_ref(), &t.name).await?,
+        };
+
+        let template = if let Some(existing) = existing {
+            existing.new_version(t.source)
+        } else {
+            RuleTemplate::new(t.name, t.source)
+        };
+
+        by_name.insert(template.name.clone(), template.clone());
+        pending.push(template);
+    }
+
+    // Resolve every policy's template before anything is written
+    let mut pending_policies = Vec::with_capacity(req.policies.len());
+    for p in req.policies {
+        let template = match by_name.get(&p.rule_template_name) {
+            Some(t) => t.clone(),
+            None => RuleTemplateStorage::get_latest_by_name(state.rule_storage.as_ref(), &p.rule_template_name)
+                .await?
+                .ok_or_else(|| {
+                    ApiError::BadRequest(format!("Rule template '{}' not found", p.rule_template_name))
+                })?,
+        };
+
+        let mut policy = Policy::new(p.name, template.id, template.version, p.metadata);
+        policy.description = p.description;
+        pending_policies.push(policy);
+    }
+
+    let mut templates = Vec::with_capacity(pending.len());
+    for template in pending {
+        templates.push(RuleTemplateStorage::save(state.rule_storage.as_ref(), template).await?);
+    }
+
+    let mut policies = Vec::with_capacity(pending_policies.len());
+    for policy in pending_policies {
+        policies.push(PolicyStorage::save(state.policy_storage.as_ref(), policy).await?);
+    }
+
+    // Single bundle rebuild for the whole batch
+    if let Err(e) = rebuild_bundle(&state, &policies).await {
+        tracing::error!("Failed to rebuild bundle: {}", e);
+    }
+
+    tracing::info!(
+        "Bulk setup created {} rule templates and {} policies",
+        templates.len(),
+        policies.len()
+    );
+
+    Ok((StatusCode::CREATED, Json(BulkSetupResponse { templates, policies })))
+}
+
 // ==================== Execution Handler ====================
 
 /// Execute a policy with input facts
@@ -261,7 +334,7 @@ pub async fn execute_policy(
         b.clone()
     } else {
         drop(bundle_guard);
-        rebuild_bundle(&state, None).await?;
+        rebuild_bundle(&state, &[]).await?;
         let guard = state.cached_bundle.read().await;
         guard.as_ref().ok_or_else(|| ApiError::Internal("Failed to build bundle".into()))?.clone()
     };
@@ -26,6 +26,8 @@ pub fn create_router(app_state: Arc<AppState>) -> Router {
         // Policies
         .route("/api/policies", post(handlers::create_policy).get(handlers::list_policies))
         .route("/api/policies/:id", get(handlers::get_policy))
+        // Bulk setup
+        .route("/api/bulk-setup", post(handlers::bulk_setup))
         // Execution
         .route("/api/execute", post(handlers::execute_policy))
         // Middleware
@@ -201,3 +201,121 @@ async fn test_multiple_policies_bundling() {
     let out: serde_json::Value = serde_json::from_slice(&axum::body::to_bytes(res.into_body(), usize::MAX).await.unwrap()).unwrap();
     assert_eq!(out["conditionMet"], false);
 }
+
+#[tokio::test]
+async fn test_bulk_setup() {
+    let storage = Arc::new(InMemoryStorage::new());
+    let app_state = Arc::new(AppState::with_storage(storage));
+    let app = create_router(app_state);
+
+    let req = Request::builder()
+        .method("POST")
+        .uri("/api/bulk-setup")
+        .header("content-type", "application/json")
+        .body(Body::from(json!({
+            "templates": [
+                { "name": "bulk-rule", "source": "rule(\"bulk\").when(f => f.value > 10).then(f => ({ result: \"high\" }))" }
+            ],
+            "policies": [
+                { "name": "bulk-policy", "rule_template_name": "bulk-rule", "metadata": {} }
+            ]
+        }).to_string()))
+        .unwrap();
+
+    let response = app.clone().oneshot(req).await.unwrap();
+    assert_eq!(response.status(), StatusCode::CREATED);
+
+    let body_bytes = axum::body::to_bytes(response.into_body(), usize::MAX).await.unwrap();
+    let body: serde_json::Value = serde_json::from_slice(&body_bytes).unwrap();
+    assert_eq!(body["templates"][0]["name"], "bulk-rule");
+    assert_eq!(body["policies"][0]["rule_template_id"], body["templates"][0]["id"]);
+    let policy_id = body["policies"][0]["id"].as_str().unwrap();
+
+    // The single bundle rebuild must include the new policy
+    let req = Request::builder()
+        .method("POST")
+        .uri("/api/execute")
+        .header("content-type", "application/json")
+        .body(Body::from(json!({
+            "policy_id": policy_id,
+            "facts": { "value": 20 }
+        }).to_string()))
+        .unwrap();
+
+    let response = app.clone().oneshot(req).await.unwrap();
+    assert_eq!(response.status(), StatusCode::OK);
+
+    let body_bytes = axum::body::to_bytes(response.into_body(), usize::MAX).await.unwrap();
+    let exec_body: serde_json::Value = serde_json::from_slice(&body_bytes).unwrap();
+    assert_eq!(exec_body["output_facts"]["result"], "high");
+}
+
+#[tokio::test]
+async fn test_bulk_setup_unknown_template_writes_nothing() {
+    let storage = Arc::new(InMemoryStorage::new());
+    let app_state = Arc::new(AppState::with_storage(storage));
+    let app = create_router(app_state);
+
+    let req = Request::builder()
+        .method("POST")
+        .uri("/api/bulk-setup")
+        .header("content-type", "application/json")
+        .body(Body::from(json!({
+            "templates": [
+                { "name": "bulk-rule", "source": "rule(\"bulk\").when(f => true).then(f => ({ result: \"ok\" }))" }
+            ],
+            "policies": [
+                { "name": "bulk-policy", "rule_template_name": "missing-rule", "metadata": {} }
+            ]
+        }).to_string()))
+        .unwrap();
+
+    let response = app.clone().oneshot(req).await.unwrap();
+    assert_eq!(response.status(), StatusCode::BAD_REQUEST);
+
+    // The batch is rejected before any template is saved
+    let req = Request::builder()
+        .method("GET")
+        .uri("/api/rule-templates")
+        .body(Body::empty())
+        .unwrap();
+
+    let response = app.clone().oneshot(req).await.unwrap();
+    assert_eq!(response.status(), StatusCode::OK);
+
+    let body_bytes = axum::body::to_bytes(response.into_body(), usize::MAX).await.unwrap();
+    let names: serde_json::Value = serde_json::from_slice(&body_bytes).unwrap();
+    assert_eq!(names, json!([]));
+}
+
+#[tokio::test]
+async fn test_bulk_setup_repeated_template_binds_latest_version() {
+    let storage = Arc::new(InMemoryStorage::new());
+    let app_state = Arc::new(AppState::with_storage(storage));
+    let app = create_router(app_state);
+
+    let req = Request::builder()
+        .method("POST")
+        .uri("/api/bulk-setup")
+        .header("content-type", "application/json")
+        .body(Body::from(json!({
+            "templates": [
+                { "name": "bulk-rule", "source": "rule(\"v1\").when(f => true).then(f => ({ result: \"v1\" }))" },
+                { "name": "bulk-rule", "source": "rule(\"v2\").when(f => true).then(f => ({ result: \"v2\" }))" }
+            ],
+            "policies": [
+                { "name": "bulk-policy", "rule_template_name": "bulk-rule", "metadata": {} }
+            ]
+        }).to_string()))
+        .unwrap();
+
+    let response = app.clone().oneshot(req).await.unwrap();
+    assert_eq!(response.status(), StatusCode::CREATED);
+
+    let body_bytes = axum::body::to_bytes(response.into_body(), usize::MAX).await.unwrap();
+    let body: serde_json::Value = serde_json::from_slice(&body_bytes).unwrap();
+    assert_eq!(body["templates"][0]["version"], 1);
+    assert_eq!(body["templates"][1]["version"], 2);
+    assert_eq!(body["policies"][0]["rule_template_id"], body["templates"][1]["id"]);
+    assert_eq!(body["policies"][0]["rule_template_version"], 2);
+}
@@ -166,6 +166,32 @@ pub struct CreatePolicyRequest {
     pub description: Option<String>,
 }
 
+/// Policy entry in a bulk setup request, referencing its template by name
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct BulkPolicyRequest {
+    pub name: String,
+    pub rule_template_name: String,
+    #[serde(default)]
+    pub metadata: serde_json::Value,
+    pub description: Option<String>,
+}
+
+/// Request to create several rule templates and policies in one call
+#[derive(Debug, Clone, Default, Serialize, Deserialize)]
+pub struct BulkSetupRequest {
+    #[serde(default)]
+    pub templates: Vec<CreateRuleTemplateRequest>,
+    #[serde(default)]
+    pub policies: Vec<BulkPolicyRequest>,
+}
+
+/// Response containing everything created by a bulk setup request
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct BulkSetupResponse {
+    pub templates: Vec<RuleTemplate>,
+    pub policies: Vec<Policy>,
+}
+
 /// Request to execute a policy
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct ExecutePolicyRequest {
@@ -2,9 +2,15 @@
 pytest-bdd fixtures and configuration
 Includes infrastructure support for Couchbase, environment variables, etc.
 """
+import functools
+import importlib.util
 import os
+from types import SimpleNamespace
+
+import httpx
 import pytest
-import requests
+
+from steps import bulk_setup
 
 # Environment configuration
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:8080")
@@ -13,6 +19,9 @@ CB_USER = os.environ.get("CB_USER", "Administrator")
 CB_PASSWORD = os.environ.get("CB_PASSWORD", "password")
 CB_BUCKET = os.environ.get("CB_BUCKET", "policy-hub")
 
+# Fail fast when the API is down: 0.25s to connect, 0.5s for the rest
+HEALTH_TIMEOUT = httpx.Timeout(0.5, connect=0.25)
+
 
 @pytest.fixture(scope="session")
 def api_base_url():
@@ -22,76 +31,114 @@ def api_base_url():
 
 @pytest.fixture(scope="session")
 def api_client():
-    """HTTP client session for API requests."""
-    session = requests.Session()
-    session.headers.update({"Content-Type": "application/json"})
-    return session
+    """HTTP client for API requests (pooled, keep-alive, HTTP/2 where offered)."""
+    client = httpx.Client(
+        base_url=API_BASE_URL,
+        http2=True,
+        headers={"Content-Type": "application/json"},
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=10.0,
+    )
+    yield client
+    client.close()
 
 
-@pytest.fixture
-def context(api_base_url):
-    """Shared context for step data passing."""
+@pytest.fixture(scope="session")
+def context(api_base_url, api_client):
+    """Shared context for step data passing (reset before each scenario)."""
     return {
         "base_url": api_base_url,
+        "http": api_client,
         "last_response": None,
         "last_response_json": None,
         "template_ids": {},
         "policy_ids": {},
+        "bulk_created": set(),
     }
 
 
-# Optional Couchbase fixtures - only if couchbase SDK is installed
-try:
+# Optional Couchbase fixtures - only if couchbase SDK is installed.
+# The SDK is imported on first use so collection doesn't pay for it.
+COUCHBASE_AVAILABLE = importlib.util.find_spec("couchbase") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_cb():
+    """Import the Couchbase SDK symbols once."""
+    from datetime import timedelta
+    from couchbase.auth import PasswordAuthenticator
     from couchbase.cluster import Cluster
     from couchbase.options import ClusterOptions
-    from couchbase.auth import PasswordAuthenticator
-    from datetime import timedelta
-    
-    COUCHBASE_AVAILABLE = True
-    
-    @pytest.fixture(scope="session")
-    def couchbase_cluster():
-        """Connect to Couchbase for test data verification."""
-        auth = PasswordAuthenticator(CB_USER, CB_PASSWORD)
-        options = ClusterOptions(auth)
-        options.apply_profile("wan_development")  # For local dev
-        cluster = Cluster(CB_HOST, options)
-        cluster.wait_until_ready(timedelta(seconds=5))
-        return cluster
-    
-    @pytest.fixture
-    def policy_bucket(couchbase_cluster):
-        """Get the policy-hub bucket for data validation."""
-        return couchbase_cluster.bucket(CB_BUCKET)
-    
-    @pytest.fixture
-    def policy_collection(policy_bucket):
-        """Get the default collection for policy documents."""
-        return policy_bucket.default_collection()
-
-except ImportError:
-    COUCHBASE_AVAILABLE = False
-    
-    @pytest.fixture
-    def couchbase_cluster():
-        pytest.skip("Couchbase SDK not installed - skipping DB validation tests")
-    
-    @pytest.fixture
-    def policy_bucket():
-        pytest.skip("Couchbase SDK not installed - skipping DB validation tests")
-    
-    @pytest.fixture
-    def policy_collection():
+
+    return SimpleNamespace(
+        Cluster=Cluster,
+        ClusterOptions=ClusterOptions,
+        PasswordAuthenticator=PasswordAuthenticator,
+        timedelta=timedelta,
+    )
+
+
+def _require_couchbase():
+    if not COUCHBASE_AVAILABLE:
         pytest.skip("Couchbase SDK not installed - skipping DB validation tests")
 
 
+@pytest.fixture(scope="session")
+def couchbase_cluster():
+    """Connect to Couchbase for test data verification."""
+    _require_couchbase()
+    cb = _load_cb()
+    auth = cb.PasswordAuthenticator(CB_USER, CB_PASSWORD)
+    options = cb.ClusterOptions(auth)
+    options.apply_profile("wan_development")  # For local dev
+    cluster = cb.Cluster(CB_HOST, options)
+    cluster.wait_until_ready(cb.timedelta(seconds=5))
+    return cluster
+
+
+@pytest.fixture(scope="session")
+def policy_bucket(couchbase_cluster):
+    """Get the policy-hub bucket for data validation."""
+    return couchbase_cluster.bucket(CB_BUCKET)
+
+
+@pytest.fixture(scope="session")
+def policy_collection(policy_bucket):
+    """Get the default collection for policy documents."""
+    return policy_bucket.default_collection()
+
+
 # Test lifecycle hooks
-@pytest.fixture(autouse=True)
-def check_api_available(api_base_url, api_client):
-    """Ensure API is available before running tests."""
+@pytest.fixture(scope="session")
+def api_health(api_base_url, api_client):
+    """Probe /health once per session; returns a skip reason or None."""
     try:
-        response = api_client.get(f"{api_base_url}/health", timeout=5)
+        response = api_client.get(f"{api_base_url}/health", timeout=HEALTH_TIMEOUT)
         if response.status_code != 200:
-            pytest.skip(f"API not available at {api_base_url}")
-    except requests.exceptions.ConnectionError:
-        pytest.skip(f"Cannot connect to API at {api_base_url}")
+            return f"API not available at {api_base_url}"
+    except httpx.TimeoutException:
+        return f"API at {api_base_url} did not answer /health in time"
+    except httpx.TransportError:
+        return f"Cannot connect to API at {api_base_url}"
+    return None
+
+
+@pytest.fixture(autouse=True)
+def check_api_available(api_health):
+    """Ensure API is available before running tests."""
+    if api_health:
+        pytest.skip(api_health)
+
+
+def pytest_bdd_before_scenario(request, feature, scenario):
+    """Reset the shared context, then create the scenario's Given data in bulk."""
+    context = request.getfixturevalue("context")
+    context.update({
+        "base_url": request.getfixturevalue("api_base_url"),
+        "last_response": None,
+        "last_response_json": None,
+    })
+    context["template_ids"].clear()
+    context["policy_ids"].clear()
+    context["bulk_created"].clear()
+    bulk_setup(context, scenario.steps)
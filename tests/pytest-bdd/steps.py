@@ -2,173 +2,327 @@
 Step definitions for pytest-bdd.
 All steps are pure HTTP-based - no domain knowledge required.
 """
-import json
-import requests
+import os
+from operator import itemgetter
+
+import orjson
+from parse import with_pattern
 from pytest_bdd import given, when, then, parsers
+from pytest_bdd.parsers import cfparse
+
+_JSON_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+_DEFAULT_SOURCE = 'rule("default").when(f => true).then(f => ({result: "ok"}))'
+
+
+@with_pattern(r"-?\d+")
+def _parse_number(text):
+    return int(text)
+
+
+_EXTRA_TYPES = {"Number": _parse_number}
+
+# Step patterns shared with the bulk setup hook
+API_AVAILABLE = cfparse('the API is available at "{url}"')
+TEMPLATE_EXISTS = cfparse('a rule template "{name}" exists')
+TEMPLATE_EXISTS_WITH_SOURCE = cfparse('a rule template "{name}" exists with source:')
+POLICY_EXISTS = cfparse('a policy "{name}" exists using template "{template_name}"')
+
+# Cleared once the API answers 404 for /api/bulk-setup
+_bulk_setup_supported = True
 
 
 # ==================== GIVEN Steps ====================
 
-@given(parsers.parse('the API is available at "{url}"'))
+@given(API_AVAILABLE)
 def api_available(context, url):
     """Verify API is running and set base URL."""
     context["base_url"] = url
-    resp = requests.get(f"{url}/health")
+    resp = context["http"].get(f"{url}/health")
     assert resp.status_code == 200, f"API not available at {url}"
 
 
-@given(parsers.parse('a rule template "{name}" exists'))
+@given(TEMPLATE_EXISTS)
 def template_exists(context, name):
     """Create a rule template with default source."""
-    source = 'rule("default").when(f => true).then(f => ({result: "ok"}))'
-    _create_template(context, name, source)
+    if _consume_bulk_created(context, "template", name):
+        return
+    _create_template(context, name, _DEFAULT_SOURCE)
 
 
-@given(parsers.parse('a rule template "{name}" exists with source:'))
+@given(TEMPLATE_EXISTS_WITH_SOURCE)
 def template_exists_with_source(context, name, docstring):
     """Create a rule template with specified source."""
+    if _consume_bulk_created(context, "template", name):
+        return
     _create_template(context, name, docstring.strip())
 
 
-@given(parsers.parse('a policy "{name}" exists using template "{template_name}"'))
+@given(POLICY_EXISTS)
 def policy_exists(context, name, template_name):
     """Create a policy using specified template."""
+    if _consume_bulk_created(context, "policy", name):
+        return
     template_id = context["template_ids"].get(template_name)
     assert template_id, f"Template '{template_name}' not found"
     
     payload = {
-        "name": name,
+        "name": _worker_scoped(name),
         "rule_template_id": template_id,
         "metadata": {}
     }
-    resp = requests.post(
-        f"{context['base_url']}/api/policies",
-        json=payload
-    )
+    resp = _post_json(context, f"{context['base_url']}/api/policies", payload)
     assert resp.status_code == 201, f"Failed to create policy: {resp.text}"
-    data = resp.json()
+    data = _json(resp)
     context["policy_ids"][name] = data["id"]
 
 
 # ==================== WHEN Steps ====================
 
-@when(parsers.parse('I POST to "{endpoint}" with:'))
+@when(cfparse('I POST to "{endpoint}" with:'))
 def post_to_endpoint(context, endpoint, docstring):
     """Make a POST request with JSON body."""
-    payload = json.loads(docstring)
+    payload = orjson.loads(docstring)
     url = f"{context['base_url']}{endpoint}"
-    resp = requests.post(url, json=payload)
-    context["last_response"] = resp
+    resp = _post_json(context, url, payload)
+    _set_response(context, resp)
     
     # Store IDs for templates/policies
     if resp.status_code in (200, 201):
-        data = resp.json()
-        if "id" in data:
+        data = context["last_response_json"]
+        if isinstance(data, dict) and "id" in data:
             if "rule_template_id" in data:
                 context["policy_ids"][data.get("name", "")] = data["id"]
             else:
                 context["template_ids"][data.get("name", "")] = data["id"]
 
 
-@when(parsers.parse('I GET "{endpoint}"'))
+@when(cfparse('I GET "{endpoint}"'))
 def get_endpoint(context, endpoint):
     """Make a GET request."""
     url = f"{context['base_url']}{endpoint}"
-    resp = requests.get(url)
-    context["last_response"] = resp
+    resp = context["http"].get(url)
+    _set_response(context, resp)
 
 
-@when(parsers.parse('I execute policy "{name}" with facts:'))
+@when(cfparse('I execute policy "{name}" with facts:'))
 def execute_policy(context, name, docstring):
     """Execute a policy with given facts."""
     policy_id = context["policy_ids"].get(name)
     assert policy_id, f"Policy '{name}' not found"
     
-    facts = json.loads(docstring)
+    facts = orjson.loads(docstring)
     payload = {
         "policy_id": policy_id,
         "facts": facts
     }
     url = f"{context['base_url']}/api/execute"
-    resp = requests.post(url, json=payload)
-    context["last_response"] = resp
+    resp = _post_json(context, url, payload)
+    _set_response(context, resp)
 
 
 # ==================== THEN Steps ====================
 
-@then(parsers.parse('the response status should be {status:d}'))
+@then(cfparse('the response status should be {status:Number}', extra_types=_EXTRA_TYPES))
 def response_status(context, status):
     """Assert response status code."""
     resp = context["last_response"]
     assert resp.status_code == status, f"Expected {status}, got {resp.status_code}: {resp.text}"
 
 
-@then(parsers.parse('the response should contain "{text}"'))
+@then(cfparse('the response should contain "{text}"'))
 def response_contains(context, text):
     """Assert response body contains text."""
     resp = context["last_response"]
     assert text in resp.text, f"Response does not contain '{text}': {resp.text}"
 
 
-@then(parsers.parse('the response field "{field}" should be {value:d}'))
+@then(cfparse('the response field "{field}" should be {value:Number}', extra_types=_EXTRA_TYPES))
 def response_field_int(context, field, value):
     """Assert integer field value."""
-    data = context["last_response"].json()
-    assert data.get(field) == value, f"Field '{field}' is {data.get(field)}, expected {value}"
+    data = context["last_response_json"]
+    actual = _field(context, data, field)
+    assert actual == value, f"Field '{field}' is {actual}, expected {value}"
 
 
-@then(parsers.parse('the response field "{field}" should be null'))
+@then(cfparse('the response field "{field}" should be null'))
 def response_field_null(context, field):
     """Assert field is null."""
-    data = context["last_response"].json()
-    assert data.get(field) is None, f"Field '{field}' is not null: {data.get(field)}"
+    data = context["last_response_json"]
+    actual = _field(context, data, field)
+    assert actual is None, f"Field '{field}' is not null: {actual}"
 
 
-@then("the response should be a list")
+@then(parsers.re(r'the response should be a list'))
 def response_is_list(context):
     """Assert response is a list."""
-    data = context["last_response"].json()
+    data = context["last_response_json"]
     assert isinstance(data, list), f"Response is not a list: {type(data)}"
 
 
-@then("the execution should succeed")
+@then(parsers.re(r'the execution should succeed'))
 def execution_succeeds(context):
     """Assert execution succeeded."""
-    data = context["last_response"].json()
-    assert data.get("success") is True, f"Execution failed: {data}"
+    data = context["last_response_json"]
+    assert _field(context, data, "success") is True, f"Execution failed: {data}"
 
 
-@then("the condition should be met")
+@then(parsers.re(r'the condition should be met'))
 def condition_met(context):
     """Assert condition was met."""
-    data = context["last_response"].json()
-    assert data.get("condition_met") is True, f"Condition not met: {data}"
+    data = context["last_response_json"]
+    assert _field(context, data, "condition_met") is True, f"Condition not met: {data}"
 
 
-@then("the condition should NOT be met")
+@then(parsers.re(r'the condition should NOT be met'))
 def condition_not_met(context):
     """Assert condition was not met."""
-    data = context["last_response"].json()
-    assert data.get("condition_met") is False, f"Condition unexpectedly met: {data}"
+    data = context["last_response_json"]
+    assert _field(context, data, "condition_met") is False, f"Condition unexpectedly met: {data}"
 
 
-@then(parsers.parse('the output field "{field}" should be {value:d}'))
+@then(cfparse('the output field "{field}" should be {value:Number}', extra_types=_EXTRA_TYPES))
 def output_field_value(context, field, value):
     """Assert output_facts field value."""
-    data = context["last_response"].json()
-    output = data.get("output_facts", {})
-    assert output.get(field) == value, f"Output field '{field}' is {output.get(field)}, expected {value}"
+    data = context["last_response_json"]
+    output = _field(context, data, "output_facts")
+    assert isinstance(output, dict), f"No output_facts in {data}"
+    actual = _field(context, output, field)
+    assert actual == value, f"Output field '{field}' is {actual}, expected {value}"
+
+
+# ==================== Bulk Setup ====================
+
+def bulk_setup(context, steps):
+    """
+    Create the leading Given templates/policies of a scenario in one request.
+
+    Collection stops at the first step that can't be batched without changing
+    its meaning (a repeated name, an unknown step, a policy on a template from
+    outside the batch). Steps created here are recorded in
+    context["bulk_created"] and skip their own POST; everything else, including
+    the whole batch when the API has no bulk endpoint or rejects it, is posted
+    by the steps themselves.
+    """
+    global _bulk_setup_supported
+    if not _bulk_setup_supported:
+        return
+
+    base_url = context["base_url"]
+    templates, policies = [], []
+    template_names, policy_names = set(), set()
+    for step in steps:
+        if step.type != "given":
+            break
+        if API_AVAILABLE.is_matching(step.name):
+            base_url = API_AVAILABLE.parse_arguments(step.name)["url"]
+            continue
+        if TEMPLATE_EXISTS.is_matching(step.name):
+            name = TEMPLATE_EXISTS.parse_arguments(step.name)["name"]
+            source = _DEFAULT_SOURCE
+        elif TEMPLATE_EXISTS_WITH_SOURCE.is_matching(step.name):
+            name = TEMPLATE_EXISTS_WITH_SOURCE.parse_arguments(step.name)["name"]
+            source = (step.docstring or "").strip()
+        elif POLICY_EXISTS.is_matching(step.name):
+            args = POLICY_EXISTS.parse_arguments(step.name)
+            if args["name"] in policy_names or args["template_name"] not in template_names:
+                break
+            policies.append({
+                "name": args["name"],
+                "rule_template_name": args["template_name"],
+                "metadata": {},
+            })
+            policy_names.add(args["name"])
+            continue
+        else:
+            break
+        if name in template_names:
+            break  # A new version must not be visible to earlier policies
+        templates.append({"name": name, "source": source})
+        template_names.add(name)
+
+    if not templates:
+        return
+
+    payload = {
+        "templates": templates,
+        "policies": [{**p, "name": _worker_scoped(p["name"])} for p in policies],
+    }
+    resp = _post_json(context, f"{base_url}/api/bulk-setup", payload)
+    if resp.status_code == 404:  # Only a missing route answers 404
+        _bulk_setup_supported = False
+        return
+    if resp.status_code != 201:
+        return  # Let the Given steps post individually and report the failure
+
+    data = _json(resp)
+    for created in data["templates"]:
+        context["template_ids"][created["name"]] = created["id"]
+        context["bulk_created"].add(("template", created["name"]))
+    for requested, created in zip(policies, data["policies"]):
+        context["policy_ids"][requested["name"]] = created["id"]
+        context["bulk_created"].add(("policy", requested["name"]))
 
 
 # ==================== Helpers ====================
 
+def _post_json(context, url, payload):
+    """POST a pre-serialized JSON body."""
+    return context["http"].post(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+
+
+def _json(resp):
+    """Decode a response body once and cache it on the response."""
+    try:
+        return resp._cached_json
+    except AttributeError:
+        resp._cached_json = orjson.loads(resp.content)
+        return resp._cached_json
+
+
+def _set_response(context, resp):
+    """Record the last response and decode its JSON body once for the Then steps."""
+    context["last_response"] = resp
+    try:
+        context["last_response_json"] = _json(resp)
+    except orjson.JSONDecodeError:
+        context["last_response_json"] = None
+
+
+def _field(context, data, field):
+    """Read a field through a per-field itemgetter cached on the context; None if absent."""
+    assert isinstance(data, dict), (
+        f"Cannot read '{field}' from {data!r}: response is not a JSON object: "
+        f"{context['last_response'].text}"
+    )
+    getters = context.setdefault("_getters", {})
+    getter = getters.get(field)
+    if getter is None:
+        getter = getters[field] = itemgetter(field)
+    try:
+        return getter(data)
+    except KeyError:
+        return None
+
+
+def _worker_scoped(name):
+    """Suffix a name with the pytest-xdist worker id, if running distributed."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    return f"{name}-{worker}" if worker else name
+
+
+def _consume_bulk_created(context, kind, name):
+    """Return True once if bulk setup already created this Given's entity."""
+    try:
+        context["bulk_created"].remove((kind, name))
+    except KeyError:
+        return False
+    return True
+
+
 def _create_template(context, name, source):
     """Helper to create a rule template."""
     payload = {"name": name, "source": source}
-    resp = requests.post(
-        f"{context['base_url']}/api/rule-templates",
-        json=payload
-    )
+    resp = _post_json(context, f"{context['base_url']}/api/rule-templates", payload)
     assert resp.status_code == 201, f"Failed to create template: {resp.text}"
-    data = resp.json()
+    data = _json(resp)
     context["template_ids"][name] = data["id"]
@@ -39,7 +39,7 @@ if [ -d ".venv" ]; then
     API_BASE_URL="$API_BASE_URL" pytest -v --tb=short || echo "⚠️ pytest-bdd had failures"
     deactivate
 else
-    echo "⚠️ Python venv not setup. Run: python -m venv .venv && source .venv/bin/activate && pip install pytest pytest-bdd requests"
+    echo "⚠️ Python venv not setup. Run: python -m venv .venv && source .venv/bin/activate && pip install pytest pytest-bdd pytest-xdist 'httpx[http2]' orjson"
 fi
 cd ..
 